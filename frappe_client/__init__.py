@@ -1 +1,13 @@
-from .frappe_client import FrappeRequest  # noqa
\ No newline at end of file
+from .frappe_client import FrappeRequest  # noqa
+
+try:
+    from .async_client import AsyncFrappeRequest  # noqa
+except ImportError:
+    # aiohttp is an optional dependency
+    pass
+
+try:
+    from .http2_client import Http2FrappeRequest  # noqa
+except ImportError:
+    # httpx is an optional dependency
+    pass
\ No newline at end of file
@@ -0,0 +1,380 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+
+import aiohttp
+
+from .frappe_exceptions import GeneralException, MissingConfigException
+
+
+class AsyncFrappeRequest(object):
+    """Asyncio counterpart of `FrappeRequest` built on `aiohttp`.
+
+    Mirrors the synchronous client's constructor and verbs but exposes
+    them as coroutines, so many independent calls can be overlapped on
+    one event loop instead of paying one round-trip each in sequence:
+
+        async with AsyncFrappeRequest(url, username=usr, password=pwd) as client:
+            responses = await asyncio.gather(
+                client.get("method.one"),
+                client.get("method.two"),
+                client.get("method.three"),
+            )
+
+    The underlying `aiohttp.ClientSession` is created lazily on first
+    use (it needs a running event loop) and closed via `close()` or the
+    async context manager.
+
+    Attributes:
+            url: URL of Frappe site.
+            usr (str): Username to Frappe Login.
+            pwd (str): Password to Frappe Login.
+            session_data (dict): dict of session object cookie data.
+            api_key(str): Api key for token based auth.
+            api_secret(str): Api secret for token based auth.
+            callback (func): Callback function to handle session data
+    """
+
+    def __init__(self,
+        url, username=None, password=None, session_data=None, api_key=None, api_secret=None, callback=None, headers=None,
+        cache_ttl=0, cache_max_entries=256):
+        """
+
+        Args:
+            cache_ttl (int): Seconds to serve repeated GETs from an
+                in-process cache; 0 (the default) disables caching
+            cache_max_entries (int): Cap on cached responses; oldest
+                entries are evicted first
+
+        Returns:
+                - <AsyncFrappeRequest> object initialized
+        """
+        self.url = url
+        self.usr = username
+        self.pwd = password
+        self.session_data = None
+        self.callback = callback
+        self.headers = headers
+        self.api_key = api_key
+        self.api_secret = api_secret
+
+        self._session = None
+        # Guards session creation and re-login so concurrent 403s don't
+        # stampede the login endpoint.
+        self._login_lock = asyncio.Lock()
+        self._session_generation = 0
+
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self._cache = OrderedDict()
+
+        if session_data:
+            # Make sure user:pass exists for 403 relogins
+            if not all([self.usr, self.pwd]):
+                raise MissingConfigException("Missing user, password for session based auth.")
+            self.session_data = session_data
+
+    @property
+    def is_legacy_auth(self):
+        if (self.usr and self.pwd) or self.session_data:
+            return True
+        return False
+
+    async def _ensure_session(self):
+        """
+        Lazily creates the `aiohttp.ClientSession` and performs the
+        initial authentication, exactly once even under concurrent
+        first calls.
+
+        Returns:
+            session: <aiohttp.ClientSession> object
+        """
+        if self._session is not None:
+            return self._session
+
+        async with self._login_lock:
+            if self._session is not None:
+                return self._session
+
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=64, keepalive_timeout=75))
+
+            if self.session_data:
+                self.set_session_token(self.session_data)
+            elif self.usr and self.pwd:
+                login_response = await self._login()
+                self.session_data = self._get_cookie_data(login_response)
+            elif self.api_key and self.api_secret:
+                self._session.headers.update({"Authorization": "token {api_key}:{api_secret}".format(
+                    api_key=self.api_key,
+                    api_secret=self.api_secret
+                )})
+        return self._session
+
+    def _get_cookie_data(self, response):
+        return {name: cookie.value for name, cookie in response.cookies.items()}
+
+    def _merge_headers(self, headers):
+        """
+        Merges per-call headers over the instance headers without
+        mutating either dict; the caller's values win on conflict.
+
+        Args:
+            headers (dict): Per-call headers, may be None
+
+        Returns:
+            headers (dict): Merged headers to pass to the session
+        """
+        if not self.headers:
+            return headers
+        if not headers:
+            return self.headers
+        return {**self.headers, **headers}
+
+    async def _process_response(self, response):
+        try:
+            rjson = await response.json(content_type=None)
+        except ValueError:
+            raise GeneralException("Unable to process non JSON response")
+        if rjson is None:
+            raise GeneralException("Unable to process non JSON response")
+        return rjson
+
+    async def _login(self):
+        """
+        Internal call to POST login data to Frappe.
+
+        Returns:
+            login_response: <aiohttp.ClientResponse> object
+        """
+        async with self._session.post(
+                self.url, data={'cmd': 'login', 'usr': self.usr, 'pwd': self.pwd},
+                headers=self.headers) as login_response:
+            if login_response.status == 403:
+                raise GeneralException("Invalid Session")
+            if login_response.status != 200:
+                raise GeneralException("An error with frappe response occurred")
+            await login_response.read()
+
+        # If user provides a callback function, call the function with the
+        # session data
+        if self.callback:
+            session_data = self._get_cookie_data(login_response)
+            self.callback(session_data)
+        return login_response
+
+    async def _coalesced_relogin(self):
+        """
+        Re-authenticates at most once per batch of concurrent 403s:
+        the first caller logs in while the rest wait on the lock and
+        find the session generation already bumped.
+        """
+        generation = self._session_generation
+        async with self._login_lock:
+            if self._session_generation == generation:
+                await self._login()
+                self._session_generation += 1
+
+    def set_session_token(self, session_data):
+        """
+        Updates the session cookie jar with the given session
+        cookie data.
+
+        Args:
+            session_data (dict): Dict of session cookie data
+        """
+        if session_data:
+            self._session.cookie_jar.update_cookies(session_data)
+
+    def invalidate(self, method=None):
+        """
+        Drops cached GET responses, e.g. after a `post` that is known
+        to change server state.
+
+        Args:
+            method (str): Only drop entries for this endpoint; drops
+                everything when omitted
+        """
+        if method is None:
+            self._cache.clear()
+            return
+        for key in [key for key in self._cache if key[0] == method]:
+            del self._cache[key]
+
+    async def get(self, method, params=None, headers=None):
+        """
+        Wrapper around GET API requests. Handles the 1st 403 response
+        internally.
+
+        When caching is enabled the in-flight request itself is
+        memoized (the task, not just its result), so concurrent callers
+        asking for the same thing coalesce onto one HTTP request.
+
+        Args:
+            method (str): Endpoint to call
+            params (dict): Dict representation of additional data to call
+
+        Returns:
+            response (dict): Parsed JSON response received from the Frappe server
+
+        """
+        if self.cache_ttl <= 0 or headers is not None:
+            return await self._get_uncached(method, params=params, headers=headers)
+
+        key = (method, json.dumps(params, sort_keys=True) if params else "")
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] >= now:
+            return await entry[1]
+
+        task = asyncio.ensure_future(self._get_uncached(method, params=params, headers=headers))
+        self._cache[key] = (now + self.cache_ttl, task)
+        while len(self._cache) > self.cache_max_entries:
+            # FIFO eviction: drop the oldest entry.
+            self._cache.popitem(last=False)
+        try:
+            return await task
+        except Exception:
+            # Don't cache failures.
+            self._cache.pop(key, None)
+            raise
+
+    async def _get_uncached(self, method, params=None, headers=None):
+        headers = self._merge_headers(headers)
+
+        session = await self._ensure_session()
+        endpoint = self.url + "/api/method/" + method + "/"
+
+        async with session.get(endpoint, params=params, headers=headers) as response:
+            if not (response.status == 403 and self.is_legacy_auth):
+                return await self._process_response(response)
+
+        # For the 1st 403 response try logging again
+        await self._coalesced_relogin()
+        async with session.get(endpoint, params=params, headers=headers) as response:
+            return await self._process_response(response)
+
+    async def post(self, method, data=None, json=None, headers=None):
+        """
+        Wrapper around POST API requests. Handles the 1st 403 response
+        internally
+
+        Args:
+            method (str): Endpoint to call
+            data (dict): Dict representation of additional data to send in request
+            json (json): Json representation of additional data to send in request
+
+        Returns:
+            response (dict): Parsed JSON response received from the Frappe server
+
+        """
+        headers = self._merge_headers(headers)
+
+        session = await self._ensure_session()
+        endpoint = self.url + "/api/method/" + method + "/"
+
+        async with session.post(endpoint, data=data, json=json, headers=headers) as response:
+            if not (response.status == 403 and self.is_legacy_auth):
+                return await self._process_response(response)
+
+        # For the 1st 403 response try logging again
+        await self._coalesced_relogin()
+        async with session.post(endpoint, data=data, json=json, headers=headers) as response:
+            return await self._process_response(response)
+
+    async def get_paginated_doc(
+            self, doctype, filters=None,
+            fields=None, limit_page_length=100, limit_start=None, order_by=None,
+            headers=None
+    ):
+        """
+        Wrapper around GET API for fetching doctype data in a paginated fashion.
+
+        Args:
+            doctype (str): Doctype name
+            filters (dict): Dict containing filters
+            fields (list): Fields to return from the doctype
+            limit_page_length (int): Interger indicating the page length limit
+            limit_start (int): Integer indicating the page start
+            order_by (str): String indicating to order results by
+
+        Returns:
+            response (dict): Parsed JSON pages received from the Frappe server
+        """
+        headers = self._merge_headers(headers)
+
+        start = limit_start if limit_start else 0
+        limit_page_length = 100 if not limit_page_length else limit_page_length
+        # Ask for one extra row per page: getting limit_page_length + 1
+        # rows back means another page exists, so an exactly-full last
+        # page doesn't cost a trailing probe request that returns 404.
+        params = {
+            "limit_start": str(start),
+            "limit_page_length": str(limit_page_length + 1),
+        }
+        if filters:
+            params["filters"] = json.dumps(filters)
+        if fields:
+            params["fields"] = json.dumps(fields)
+        if order_by:
+            params["order_by"] = order_by
+
+        pages = 0
+        empty_response = {"data": []}
+        endpoint = "{url}/api/resource/{doctype}/".format(
+            url=self.url,
+            doctype=doctype,
+        )
+
+        session = await self._ensure_session()
+        while True:
+            async with session.get(endpoint, params=params, headers=headers) as response:
+                # Past the end of the data.
+                if response.status == 404:
+                    if pages == 0:
+                        yield empty_response
+                    return
+
+                if response.status == 403 and self.is_legacy_auth:
+                    processed_response = None
+                else:
+                    processed_response = await self._process_response(response)
+
+            if processed_response is None:
+                # For the 1st 403 response try logging again
+                await self._coalesced_relogin()
+                async with session.get(endpoint, params=params, headers=headers) as response:
+                    processed_response = await self._process_response(response)
+
+            data = processed_response.get("data", [])
+            pages += 1
+
+            # No items: only the very first page reports emptiness.
+            if len(data) == 0:
+                if pages == 1:
+                    yield empty_response
+                return
+            # No extra row came back. last page!
+            if len(data) <= limit_page_length:
+                yield processed_response
+                return
+
+            # More pages exist; trim the probe row and continue.
+            processed_response["data"] = data[:limit_page_length]
+            yield processed_response
+
+            # Increment the offset.
+            start += limit_page_length
+            params["limit_start"] = str(start)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
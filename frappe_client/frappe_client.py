@@ -1,14 +1,66 @@
+import concurrent.futures
+import functools
 import json
-import atexit
+import threading
+import time
+from collections import OrderedDict
 
 import requests
+from urllib3.util.retry import Retry
 
 from .frappe_exceptions import GeneralException, MissingConfigException
 
+# Use orjson (a C extension, roughly 2-3x faster) for encoding request
+# params and decoding response bodies when it is installed; fall back to
+# the stdlib otherwise. orjson parses the raw bytes directly, skipping
+# the bytes->str decode that response.json() pays.
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+
+    def _loads_response(response):
+        return orjson.loads(response.content)
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj)
+
+    def _loads_response(response):
+        return response.json()
+
+# ijson enables incremental parsing of large responses; optional, the
+# streaming verb falls back to a buffered parse without it.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+@functools.lru_cache(maxsize=128)
+def _jar_cache(frozen_items):
+    """
+    Builds a cookie jar from a hashable fingerprint of a session dict.
+    Apps that reconstruct a client per request from an externally
+    persisted session (e.g. serverless cold starts) hit this with the
+    same dict every time; caching skips re-parsing it into Cookie
+    objects. Callers copy the jar before use since sessions mutate it.
+    """
+    return requests.utils.cookiejar_from_dict(dict(frozen_items))
+
 
 class FrappeRequest(object):
     """Class representation of FrappeRequest object
 
+    Can be used as a context manager to release the underlying HTTP
+    session deterministically:
+
+        with FrappeRequest(url, api_key=key, api_secret=secret) as client:
+            client.get("ping")
+
+    Otherwise the session is closed when the instance is garbage
+    collected, or explicitly via `close()`.
+
     Attributes:
             url: URL of Frappe site.
             usr (str): Username to Frappe Login.
@@ -21,21 +73,56 @@ class FrappeRequest(object):
     """
 
     def __init__(self,
-        url, username=None, password=None, session_data=None, api_key=None, api_secret=None, callback=None, headers=None):
+        url, username=None, password=None, session_data=None, api_key=None, api_secret=None, callback=None, headers=None,
+        pool_size=20, cache_ttl=0, cache_max_entries=256):
         """
 
+        Args:
+            pool_size (int): Size of the per-host HTTP connection pool
+            cache_ttl (int): Seconds to serve repeated GETs from an
+                in-process cache; 0 (the default) disables caching
+            cache_max_entries (int): Cap on cached responses; oldest
+                entries are evicted first
+
         Returns:
                 - <FrappeRequest> object initialized
         """
         self.frappe_session = requests.Session()
-        atexit.register(self.frappe_session.close)
+
+        # Default urllib3 pools hold only 10 connections per host and
+        # never retry; size the pool for concurrent use and retry
+        # transient gateway errors with a small backoff.
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.2,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=["GET", "POST"],
+            ),
+        )
+        self.frappe_session.mount("http://", adapter)
+        self.frappe_session.mount("https://", adapter)
 
         self.url = url
+        # Build the two API URL prefixes once instead of concatenating
+        # them on every call.
+        self._method_base = url.rstrip("/") + "/api/method/"
+        self._resource_base = url.rstrip("/") + "/api/resource/"
         self.usr = username
         self.pwd = password
         self.session_data = None
         self.callback = callback
         self.headers = headers
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self._cache = OrderedDict()
+
+        # Guards re-login so concurrent 403s (thread-pool pagination,
+        # call fan-out) don't stampede the login endpoint.
+        self._login_lock = threading.Lock()
+        self._session_generation = 0
 
         # If user provides `session_data` don't login again,
         # instead set the cookie data in requests.Session() object
@@ -55,6 +142,17 @@ class FrappeRequest(object):
                 api_secret=api_secret
             )})
 
+        # When no login POST was made, open a connection upfront so the
+        # first real request doesn't pay the TCP+TLS handshake. The
+        # constructor param is tested here: the login branch also fills
+        # self.session_data, but its POST already opened the connection.
+        if session_data or not (self.usr and self.pwd):
+            try:
+                self.frappe_session.head(self.url, allow_redirects=False)
+            except requests.RequestException:
+                # Warming is best effort; the first request will connect.
+                pass
+
     @property
     def is_legacy_auth(self):
         if (self.usr and self.pwd) or self.session_data:
@@ -66,7 +164,7 @@ class FrappeRequest(object):
 
     def _process_response(self, response):
         try:
-            rjson = response.json()
+            rjson = _loads_response(response)
         except ValueError:
             raise GeneralException("Unable to process non JSON response")
         return rjson
@@ -92,6 +190,98 @@ class FrappeRequest(object):
             self.callback(session_data)
         return login_response
 
+    def _coalesced_relogin(self):
+        """
+        Re-authenticates at most once per batch of concurrent 403s:
+        the first caller logs in while the rest wait on the lock and
+        find the session generation already bumped.
+        """
+        generation = self._session_generation
+        with self._login_lock:
+            if self._session_generation == generation:
+                self._login()
+                self._session_generation += 1
+
+    def _merge_headers(self, headers):
+        """
+        Merges per-call headers over the instance headers without
+        mutating either dict; the caller's values win on conflict.
+
+        Args:
+            headers (dict): Per-call headers, may be None
+
+        Returns:
+            headers (dict): Merged headers to pass to the session
+        """
+        if not self.headers:
+            return headers
+        if not headers:
+            return self.headers
+        return {**self.headers, **headers}
+
+    def _request(self, verb, url, params=None, data=None, json=None, headers=None):
+        """
+        Single implementation of the request control flow shared by the
+        verbs: merge headers, call, re-login once on the 1st 403 and
+        retry, then parse the response.
+
+        Args:
+            verb (str): HTTP verb, "GET" or "POST"
+            url (str): Fully built endpoint URL
+            params (dict): Query params to send
+            data (dict): Form data to send
+            json (json): JSON body to send
+            headers (dict): Per-call headers
+
+        Returns:
+            response (dict): Parsed JSON response received from the Frappe server
+        """
+        headers = self._merge_headers(headers)
+
+        response = self.frappe_session.request(verb, url, params=params, data=data, json=json, headers=headers)
+        if response.status_code == 403 and self.is_legacy_auth:
+            # For the 1st 403 response try logging again
+            self._coalesced_relogin()
+            response = self.frappe_session.request(verb, url, params=params, data=data, json=json, headers=headers)
+
+        return self._process_response(response)
+
+    def _cache_key(self, method, params):
+        # Params are canonicalized so dicts with the same items hash to
+        # the same key regardless of insertion order.
+        return (method, json.dumps(params, sort_keys=True) if params else "")
+
+    def _cache_lookup(self, key):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        return value
+
+    def _cache_store(self, key, value):
+        self._cache[key] = (time.monotonic() + self.cache_ttl, value)
+        while len(self._cache) > self.cache_max_entries:
+            # FIFO eviction: drop the oldest entry.
+            self._cache.popitem(last=False)
+
+    def invalidate(self, method=None):
+        """
+        Drops cached GET responses, e.g. after a `post` that is known
+        to change server state.
+
+        Args:
+            method (str): Only drop entries for this endpoint; drops
+                everything when omitted
+        """
+        if method is None:
+            self._cache.clear()
+            return
+        for key in [key for key in self._cache if key[0] == method]:
+            del self._cache[key]
+
     def set_session_token(self, session_data):
         """
         Creates a <ResponseCookieJar> object from a dict
@@ -101,10 +291,12 @@ class FrappeRequest(object):
         Args:
             session_data (dict): Dict of session cookie data
         """
-        if session_data:
-            cookiejar = requests.utils.cookiejar_from_dict(session_data)
-        # Set the cookies for future requests made by `self.frappe_session` object
-        self.frappe_session.cookies = cookiejar
+        if not session_data:
+            return
+        cookiejar = _jar_cache(tuple(sorted(session_data.items())))
+        # Set the cookies for future requests made by `self.frappe_session`
+        # object; a copy so server-set cookies don't leak into the cache.
+        self.frappe_session.cookies = cookiejar.copy()
 
     def get(self, method, params=None, headers=None):
         """
@@ -119,19 +311,20 @@ class FrappeRequest(object):
             response (<requests.Response>): Response object received from the Frappe server
 
         """
-        if headers:
-            headers.update(self.headers)
-        else:
-            headers = self.headers
-
-        response = self.frappe_session.get(self.url + "/api/method/" + method + "/", params=params, headers=headers)
-        if response.status_code == 403 and self.is_legacy_auth:
-            # For the 1st 403 response try logging again
-            login_response = self._login()
-            if login_response.status_code == 200:
-                response = self.frappe_session.get(self.url + "/api/method/" + method + "/", params=params, headers=headers)
-
-        processed_response = self._process_response(response)
+        # Serve repeated idempotent GETs from the in-process cache when
+        # enabled. Calls with custom headers are never cached as the
+        # response may vary on them.
+        cache_key = None
+        if self.cache_ttl > 0 and headers is None:
+            cache_key = self._cache_key(method, params)
+            cached = self._cache_lookup(cache_key)
+            if cached is not None:
+                return cached
+
+        endpoint = "{base}{method}/".format(base=self._method_base, method=method)
+        processed_response = self._request("GET", endpoint, params=params, headers=headers)
+        if cache_key is not None:
+            self._cache_store(cache_key, processed_response)
         return processed_response
 
     def post(self, method, data=None, json=None, headers=None):
@@ -148,24 +341,40 @@ class FrappeRequest(object):
             response (<requests.Response>): Response object received from the Frappe server
 
         """
-        if headers:
-            headers.update(self.headers)
-        else:
-            headers = self.headers
+        endpoint = "{base}{method}/".format(base=self._method_base, method=method)
+        return self._request("POST", endpoint, data=data, json=json, headers=headers)
 
-        response = self.frappe_session.post(
-            self.url + "/api/method/" + method + "/", data=data, json=json, headers=headers
-        )
-        if response.status_code == 403 and self.is_legacy_auth:
-            # For the 1st 403 response try logging again
-            login_response = self._login()
-            if login_response.status_code == 200:
-                response = self.frappe_session.post(
-                    self.url + "/api/method/" + method + "/", data=data, json=json, headers=headers
-                )
+    def call_many(self, calls, max_concurrency=8):
+        """
+        Dispatches many API calls concurrently over the pooled session
+        and returns their parsed responses in call order. Useful when
+        warming many independent endpoints (e.g. a dashboard) that
+        would otherwise serialize one round-trip each.
 
-        processed_response = self._process_response(response)
-        return processed_response
+        Each call is a `(verb, method, kwargs)` tuple where verb is
+        "GET" or "POST" and kwargs are passed through to `get`/`post`:
+
+            client.call_many([
+                ("GET", "method.one", {"params": {"a": 1}}),
+                ("POST", "method.two", {"data": {"b": 2}}),
+            ])
+
+        Keep `pool_size` at least `max_concurrency` so no call blocks
+        waiting for a pooled connection.
+
+        Args:
+            calls (list): List of (verb, method, kwargs) tuples
+            max_concurrency (int): Number of calls in flight at once
+
+        Returns:
+            responses (list): Parsed responses, in the same order as `calls`
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = [
+                executor.submit(self.get if verb == "GET" else self.post, method, **kwargs)
+                for verb, method, kwargs in calls
+            ]
+            return [future.result() for future in futures]
 
     def get_paginated_doc(
             self, doctype, filters=None,
@@ -186,70 +395,184 @@ class FrappeRequest(object):
         Returns:
             response (<requests.Response>): Response object received from the Frappe server
         """
-        if headers:
-            headers.update(self.headers)
-        else:
-            headers = self.headers
+        headers = self._merge_headers(headers)
 
         start = limit_start if limit_start else 0
-        limit_page_length = 100 if limit_page_length == 0 else limit_page_length
+        limit_page_length = 100 if not limit_page_length else limit_page_length
+        # Ask for one extra row per page: getting limit_page_length + 1
+        # rows back means another page exists, so an exactly-full last
+        # page doesn't cost a trailing probe request that returns 404.
         params = {
             "limit_start": str(start),
-            "limit_page_length": str(limit_page_length),
+            "limit_page_length": str(limit_page_length + 1),
         }
         if filters:
-            params["filters"] = json.dumps(filters)
+            params["filters"] = _dumps(filters)
         if fields:
-            params["fields"] = json.dumps(fields)
+            params["fields"] = _dumps(fields)
         if order_by:
             params["order_by"] = order_by
 
-        has = True
         pages = 0
         empty_response = {"data": []}
-        endpoint = "{url}/api/resource/{doctype}/".format(
-            url=self.url,
+        endpoint = "{base}{doctype}/".format(
+            base=self._resource_base,
             doctype=doctype,
         )
 
-        while has:
+        while True:
             response = self.frappe_session.get(endpoint, params=params, headers=headers)
 
-            # Previous iteration was the last page
+            # Past the end of the data.
             if response.status_code == 404:
-                has = False
-                yield empty_response
+                if pages == 0:
+                    yield empty_response
                 return
 
             if response.status_code == 403 and self.is_legacy_auth:
                 # For the 1st 403 response try logging again
-                login_response = self._login()
-                if login_response.status_code == 200:
-                    response = self.frappe_session.get(endpoint, params=params, headers=headers)
+                self._coalesced_relogin()
+                response = self.frappe_session.get(endpoint, params=params, headers=headers)
 
             processed_response = self._process_response(response)
+            data = processed_response.get("data", [])
             pages += 1
 
-            # No items.
-            if len(processed_response.get("data", [])) == 0:
-                yield empty_response
+            # No items: only the very first page reports emptiness.
+            if len(data) == 0:
+                if pages == 1:
+                    yield empty_response
                 return
-            # List of items fetches has lesser items than the given page size. last page!
-            elif len(processed_response.get("data", [])) < limit_page_length:
+            # No extra row came back. last page!
+            if len(data) <= limit_page_length:
                 yield processed_response
                 return
 
+            # More pages exist; trim the probe row and continue.
+            processed_response["data"] = data[:limit_page_length]
+            yield processed_response
+
             # Increment the offset.
-            if pages > 0:
-                start += limit_page_length
-                params["limit_start"] = start
+            start += limit_page_length
+            params["limit_start"] = str(start)
 
-            yield processed_response
+    def _paginated_doc_parallel(
+            self, doctype, filters=None,
+            fields=None, limit_page_length=100, limit_start=None, order_by=None,
+            headers=None, concurrency=8
+    ):
+        """
+        Parallel variant of `get_paginated_doc`. Fetches the first page
+        synchronously to learn the page size, then dispatches windows of
+        subsequent pages concurrently over a thread pool and yields them
+        back in offset order. Saves one network round-trip of latency per
+        page compared to the sequential generator.
+
+        Args:
+            doctype (str): Doctype name
+            filters (dict): Dict containing filters
+            fields (list): Fields to return from the doctype
+            limit_page_length (int): Interger indicating the page length limit
+            limit_start (int): Integer indicating the page start
+            order_by (str): String indicating to order results by
+            concurrency (int): Number of pages fetched in flight at once
+
+        Returns:
+            response (<requests.Response>): Response object received from the Frappe server
+        """
+        headers = self._merge_headers(headers)
+
+        start = limit_start if limit_start else 0
+        limit_page_length = 100 if not limit_page_length else limit_page_length
+        base_params = {
+            "limit_page_length": str(limit_page_length),
+        }
+        if filters:
+            base_params["filters"] = _dumps(filters)
+        if fields:
+            base_params["fields"] = _dumps(fields)
+        if order_by:
+            base_params["order_by"] = order_by
+
+        empty_response = {"data": []}
+        endpoint = "{base}{doctype}/".format(
+            base=self._resource_base,
+            doctype=doctype,
+        )
+
+        def fetch(offset):
+            params = dict(base_params, limit_start=str(offset))
+            response = self.frappe_session.get(endpoint, params=params, headers=headers)
+            if response.status_code == 403 and self.is_legacy_auth:
+                # For the 1st 403 response try logging again
+                self._coalesced_relogin()
+                response = self.frappe_session.get(endpoint, params=params, headers=headers)
+            return response
+
+        # Phase 1: fetch the first page on the calling thread so the page
+        # size is known and the session is refreshed before workers share it.
+        response = fetch(start)
+        if response.status_code == 404:
+            yield empty_response
+            return
+
+        processed_response = self._process_response(response)
+        if len(processed_response.get("data", [])) == 0:
+            yield empty_response
+            return
+
+        yield processed_response
+        if len(processed_response.get("data", [])) < limit_page_length:
+            return
+
+        # Phase 2: dispatch a window of the next `concurrency` offsets at a
+        # time, buffer the responses by offset and yield them in order.
+        next_start = start + limit_page_length
+        with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+            done = False
+            while not done:
+                offsets = [next_start + i * limit_page_length for i in range(concurrency)]
+                next_start = offsets[-1] + limit_page_length
+                futures = {executor.submit(fetch, offset): offset for offset in offsets}
+
+                buffered = {}
+                for future in concurrent.futures.as_completed(futures):
+                    # Futures cancelled below still come out of
+                    # as_completed; their .result() would raise.
+                    if future.cancelled():
+                        continue
+                    response = future.result()
+                    offset = futures[future]
+                    buffered[offset] = response
+                    if response.status_code == 404:
+                        # Past the end of the data; later offsets can only
+                        # 404 as well, so drop any still-pending fetches.
+                        for pending, pending_offset in futures.items():
+                            if pending_offset > offset:
+                                pending.cancel()
+
+                for offset in offsets:
+                    response = buffered.get(offset)
+                    if response is None or response.status_code == 404:
+                        done = True
+                        break
+
+                    processed_response = self._process_response(response)
+                    if len(processed_response.get("data", [])) == 0:
+                        done = True
+                        break
+
+                    yield processed_response
+
+                    # Short page: last page of the scan.
+                    if len(processed_response.get("data", [])) < limit_page_length:
+                        done = True
+                        break
 
     def get_doc(
             self, doctype, name="", filters=None,
             fields=None, limit_page_length=None, limit_start=None, order_by=None,
-            headers=None, pagination=False
+            headers=None, pagination=False, parallel=False
     ):
         """
         Wrapper around GET API for fetching doctype data.
@@ -262,6 +585,8 @@ class FrappeRequest(object):
             limit_page_length (int): Interger indicating the page length limit
             limit_start (int): Integer indicating the page start
             order_by (str): String indicating to order results by
+            pagination (bool): Fetch the doctype page by page
+            parallel (bool): Fetch pages concurrently instead of one at a time
 
         Returns:
             response (<requests.Response>): Response object received from the Frappe server
@@ -272,6 +597,15 @@ class FrappeRequest(object):
 
         # Use pagination API
         if pagination:
+            if parallel:
+                return self._paginated_doc_parallel(doctype,
+                    filters=filters,
+                    fields=fields,
+                    limit_page_length=limit_page_length,
+                    limit_start=limit_start,
+                    order_by=order_by,
+                    headers=headers
+                )
             return self.get_paginated_doc(doctype,
                 filters=filters,
                 fields=fields,
@@ -281,16 +615,53 @@ class FrappeRequest(object):
                 headers=headers
             )
 
-        if headers:
-            headers.update(self.headers)
-        else:
-            headers = self.headers
+        params = {}
+        if filters:
+            params["filters"] = _dumps(filters)
+        if fields:
+            params["fields"] = _dumps(fields)
+        if limit_start:
+            params["limit_start"] = str(limit_start)
+        if limit_page_length:
+            params["limit_page_length"] = str(limit_page_length)
+        if order_by:
+            params["order_by"] = order_by
+
+        endpoint = "{base}{doctype}/{name}".format(base=self._resource_base, doctype=doctype, name=name)
+        return self._request("GET", endpoint, params=params, headers=headers)
+
+    def get_doc_stream(
+            self, doctype, filters=None,
+            fields=None, limit_page_length=None, limit_start=None, order_by=None,
+            headers=None
+    ):
+        """
+        Streaming variant of `get_doc` for large record lists: yields
+        records one at a time while the body is still downloading,
+        instead of buffering the whole response (bytes, then str, then
+        parsed objects) before returning. Peak memory stays near one
+        record regardless of response size. Incremental parsing needs
+        `ijson`; without it the response is parsed buffered and the
+        records are yielded from the materialized list.
+
+        Args:
+            doctype (str): Doctype name
+            filters (dict): Dict containing filters
+            fields (list): Fields to return from the doctype
+            limit_page_length (int): Interger indicating the page length limit
+            limit_start (int): Integer indicating the page start
+            order_by (str): String indicating to order results by
+
+        Returns:
+            records (generator): Records under the response "data" key, one at a time
+        """
+        headers = self._merge_headers(headers)
 
         params = {}
         if filters:
-            params["filters"] = json.dumps(filters)
+            params["filters"] = _dumps(filters)
         if fields:
-            params["fields"] = json.dumps(fields)
+            params["fields"] = _dumps(fields)
         if limit_start:
             params["limit_start"] = str(limit_start)
         if limit_page_length:
@@ -298,12 +669,45 @@ class FrappeRequest(object):
         if order_by:
             params["order_by"] = order_by
 
-        response = self.frappe_session.get(self.url + "/api/resource/" + doctype + "/" + name, params=params, headers=headers)
+        endpoint = "{base}{doctype}/".format(base=self._resource_base, doctype=doctype)
+        response = self.frappe_session.get(endpoint, params=params, headers=headers, stream=True)
         if response.status_code == 403 and self.is_legacy_auth:
-            # For the 1st 403 response try logging again
-            login_response = self._login()
-            if login_response.status_code == 200:
-                response = self.frappe_session.get(self.url + "/api/resource/" + doctype + "/" + name, params=params, headers=headers)
+            # For the 1st 403 response try logging again. Close the
+            # streamed response first so its connection goes back to
+            # the pool instead of lingering until GC.
+            response.close()
+            self._coalesced_relogin()
+            response = self.frappe_session.get(endpoint, params=params, headers=headers, stream=True)
+
+        if ijson is None:
+            for record in self._process_response(response).get("data", []):
+                yield record
+            return
+
+        # Let urllib3 undo any transfer encoding so ijson sees plain
+        # JSON bytes.
+        response.raw.decode_content = True
+        try:
+            for record in ijson.items(response.raw, "data.item"):
+                yield record
+        except ijson.JSONError:
+            raise GeneralException("Unable to process non JSON response")
+        finally:
+            response.close()
 
-        processed_response = self._process_response(response)
-        return processed_response
+    def close(self):
+        self.frappe_session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            # Interpreter shutdown may have torn parts of the session
+            # down already; never raise from teardown.
+            pass